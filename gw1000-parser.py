@@ -36,22 +36,190 @@
 # 20201024
 #   - Cast observation value to float to perform the average calculations.
 #   - Remove unused import rmGetStartOfDayUtc.
+# 20261014
+#   - Use pre-compiled struct formats to read the network packet integers.
+#   - Read sensor values in place from the packet, avoid a slice per sensor.
+#   - Build the live data sensors table once at import, instead of on every sensor read.
+#   - Keep a running total of the averaged observations, the average is computed only when reported.
+#   - Bind the sensor readers once per parser instance.
+#   - Read the whole live data packet, even when it is bigger than 1KB, up to 4KB, or received in fragments.
+#   - Verify the live data packet checksum, a corrupted packet is not parsed nor counted as an observation.
+#   - Skip the ignored sensors without calling a reader function.
+#   - Log ignored and unknown sensors only when the parser debug is enabled.
+#   - Remove unused imports json and path, left from the observations data file.
+#   - Compute the start of the day once per execution.
+#   - Fix the observations shared between parser instances, now created for each instance.
+#   - Keep the connection to the GW1000 device open between executions, reconnect only on failure or on a corrupted live data packet.
+#   - Read the discovered device ip address and port with a single pre-compiled struct format.
+#   - Define the command packets once as bytes, fix the discover retries sending the last received packet.
+#   - Validate the device ip address only once.
+#   - Report the observations only when changed by the live data.
+#   - Receive the live data into a buffer allocated once.
+#   - Parse the live data in place from the receive buffer, with sensor ids read as integers.
+#   - Update the temperature and humidity average, maximum and minimum in a single pass.
+#   - Fix the parsing of missing live data, when unable to retrieve it from the device.
+#   - Read each observation only once when updating it.
+#   - Bind the RainMachine observation data types once at import.
+#   - Convert light into solar radiation with a single pre-computed ratio.
+#   - Close the discover socket after each discovery.
+#   - Enlarge the discover socket buffers.
+#   - Report the current day observations every hour, instead of on every execution.
+#   - Compute the observation counter inverse once per report.
+#   - Wait for the discover reply from 0.25 seconds up to 2 seconds, reducing the time to give up from 10 seconds.
+#   - Reduce the live data response timeout to 5 seconds.
+#   - Log the packet of an error as a single hexadecimal string.
 #
 # LICENSE: GNU General Public License v3.0
 # GitHub: https://github.com/pjpeartree/rainmachine-gw1000
 #
 
+import binascii
+import select
 import socket
 import struct
 import time
-import json
 from datetime import datetime
-from os import path
 
 from RMParserFramework.rmParser import RMParser
 from RMUtilsFramework.rmLogging import log
 from RMUtilsFramework.rmTimeUtils import rmGetStartOfDay
 
+# RainMachine observation data types, bound once to avoid the attribute lookups on every sensor read.
+_TEMPERATURE = RMParser.dataType.TEMPERATURE
+_MAXTEMP = RMParser.dataType.MAXTEMP
+_MINTEMP = RMParser.dataType.MINTEMP
+_RH = RMParser.dataType.RH
+_MAXRH = RMParser.dataType.MAXRH
+_MINRH = RMParser.dataType.MINRH
+_WIND = RMParser.dataType.WIND
+_SOLARRADIATION = RMParser.dataType.SOLARRADIATION
+_RAIN = RMParser.dataType.RAIN
+_PRESSURE = RMParser.dataType.PRESSURE
+
+# Sensor light (0.1 lux) to solar radiation (MJ/m2/h) ratio: to lux, lux into w/m2 with 0.0079
+# as the ratio at sunlight spectrum, and w/m2 to MJ/m2/h, 1 W/m2 = 1 J/m2/Sec.
+_LIGHT_TO_SOLAR_RADIATION = 0.1 * 0.0079 * 0.0036
+
+# Pre-compiled BigEndian integer formats, indexed by size in bytes and signed or unsigned.
+_U8 = struct.Struct('>B')
+_S8 = struct.Struct('>b')
+_U16 = struct.Struct('>H')
+_S16 = struct.Struct('>h')
+_U32 = struct.Struct('>I')
+_S32 = struct.Struct('>i')
+_INT_READERS = {(1, True): _U8, (1, False): _S8,
+                (2, True): _U16, (2, False): _S16,
+                (4, True): _U32, (4, False): _S32}
+# Command packets, Packet Format: HEADER, CMD, SIZE, CHECKSUM
+_CMD_BROADCAST = b'\xff\xff\x12\x03\x15'
+_CMD_GW1000_LIVE_DATA = b'\xff\xff\x27\x03\x2a'
+# Live data response HEADER and CMD
+_LIVE_DATA_HEADER = b'\xff\xff\x27'
+# Pre-compiled discover packet device address format, ip address and port.
+_DEVICE_ADDRESS = struct.Struct('>4sH')
+
+# Live data sensors, indexed by sensor id, with the reader function name and the sensor size in bytes.
+_SENSORS = {
+    0x01: ('_ignore_sensor', 2),  # Indoor Temperature (C), size in bytes:2
+    0x02: ('_outdoor_temperature', 2),  # Outdoor Temperature (C), size in bytes:2
+    0x03: ('_ignore_sensor', 2),  # Dew point (C), size in bytes:2
+    0x04: ('_ignore_sensor', 2),  # Wind chill (C), size in bytes:2
+    0x05: ('_ignore_sensor', 2),  # Heat index (C), size in bytes:2
+    0x06: ('_ignore_sensor', 1),  # Indoor Humidity (%), size in bytes:1
+    0x07: ('_outdoor_humidity', 1),  # Outdoor Humidity (%), size in bytes:1
+    0x08: ('_ignore_sensor', 2),  # Absolutely Barometric (hpa), size in bytes:2
+    0x09: ('_relative_barometric', 2),  # Relative Barometric (hpa), size in bytes:2
+    0x0A: ('_ignore_sensor', 2),  # Wind Direction (360), size in bytes:2
+    0x0B: ('_wind_speed', 2),  # Wind Speed (m/s), size in bytes:2
+    0x0C: ('_ignore_sensor', 2),  # Gust Speed (m/s), size in bytes:2
+    0x0D: ('_ignore_sensor', 2),  # Rain Event (mm), size in bytes:2
+    0x0E: ('_ignore_sensor', 2),  # Rain Rate (mm/h), size in bytes:2
+    0x0F: ('_ignore_sensor', 2),  # Rain hour (mm), size in bytes:2
+    0x10: ('_rain_day', 2),  # Rain Day (mm), size in bytes:2
+    0x11: ('_ignore_sensor', 2),  # Rain Week (mm), size in bytes:2
+    0x12: ('_ignore_sensor', 4),  # Rain Month (mm), size in bytes:4
+    0x13: ('_ignore_sensor', 4),  # Rain Year (mm), size in bytes:4
+    0x14: ('_ignore_sensor', 4),  # Rain Totals (mm), size in bytes:4
+    0x15: ('_light', 4),  # Light  (lux), size in bytes:4
+    0x16: ('_ignore_sensor', 2),  # UV  (uW/m2), size in bytes:2
+    0x17: ('_ignore_sensor', 1),  # UVI (0-15 index), size in bytes:1
+    0x18: ('_ignore_sensor', 6),  # Date and time, size in bytes:6
+    0x19: ('_ignore_sensor', 2),  # Day max_wind (m/s), size in bytes:2
+    0x1A: ('_ignore_sensor', 2),  # Temperature 1 (C), size in bytes:2
+    0x1B: ('_ignore_sensor', 2),  # Temperature 2 (C), size in bytes:2
+    0x1C: ('_ignore_sensor', 2),  # Temperature 3 (C), size in bytes:2
+    0x1D: ('_ignore_sensor', 2),  # Temperature 4 (C), size in bytes:2
+    0x1E: ('_ignore_sensor', 2),  # Temperature 5 (C), size in bytes:2
+    0x1F: ('_ignore_sensor', 2),  # Temperature 6 (C), size in bytes:2
+    0x20: ('_ignore_sensor', 2),  # Temperature 7 (C), size in bytes:2
+    0x21: ('_ignore_sensor', 2),  # Temperature 8 (C), size in bytes:2
+    0x22: ('_ignore_sensor', 1),  # Humidity 1 0-100%, size in bytes:1
+    0x23: ('_ignore_sensor', 1),  # Humidity 2 0-100%, size in bytes:1
+    0x24: ('_ignore_sensor', 1),  # Humidity 3 0-100%, size in bytes:1
+    0x25: ('_ignore_sensor', 1),  # Humidity 4 0-100%, size in bytes:1
+    0x26: ('_ignore_sensor', 1),  # Humidity 5 0-100%, size in bytes:1
+    0x27: ('_ignore_sensor', 1),  # Humidity 6 0-100%, size in bytes:1
+    0x28: ('_ignore_sensor', 1),  # Humidity 7 0-100%, size in bytes:1
+    0x29: ('_ignore_sensor', 1),  # Humidity 8 0-100%, size in bytes:1
+    0x2A: ('_ignore_sensor', 2),  # PM2.5 1 (ug/m3), size in bytes:2
+    0x2B: ('_ignore_sensor', 2),  # Soil Temperature_1 (C), size in bytes:2
+    0x2C: ('_ignore_sensor', 1),  # Soil Moisture_1 (%), size in bytes:1
+    0x2D: ('_ignore_sensor', 2),  # Soil Temperature_2 (C), size in bytes:2
+    0x2E: ('_ignore_sensor', 1),  # Soil Moisture_2 (%), size in bytes:1
+    0x2F: ('_ignore_sensor', 2),  # Soil Temperature_3 (C), size in bytes:2
+    0x30: ('_ignore_sensor', 1),  # Soil Moisture_3 (%), size in bytes:1
+    0x31: ('_ignore_sensor', 2),  # Soil Temperature_4 (C), size in bytes:2
+    0x32: ('_ignore_sensor', 1),  # Soil Moisture_4 (%), size in bytes:1
+    0x33: ('_ignore_sensor', 2),  # Soil Temperature_5 (C), size in bytes:2
+    0x34: ('_ignore_sensor', 1),  # Soil Moisture_5 (%), size in bytes:1
+    0x35: ('_ignore_sensor', 2),  # Soil Temperature_6 (C), size in bytes:2
+    0x36: ('_ignore_sensor', 1),  # Soil Moisture_6 (%), size in bytes:1
+    0x37: ('_ignore_sensor', 2),  # Soil Temperature_7 (C), size in bytes:2
+    0x38: ('_ignore_sensor', 1),  # Soil Moisture_7 (%), size in bytes:1
+    0x39: ('_ignore_sensor', 2),  # Soil Temperature_8 (C), size in bytes:2
+    0x3A: ('_ignore_sensor', 1),  # Soil Moisture_8 (%), size in bytes:1
+    0x3B: ('_ignore_sensor', 2),  # Soil Temperature_9 (C), size in bytes:2
+    0x3C: ('_ignore_sensor', 1),  # Soil Moisture_9 (%), size in bytes:1
+    0x3D: ('_ignore_sensor', 2),  # Soil Temperature_10 (C), size in bytes:2
+    0x3E: ('_ignore_sensor', 1),  # Soil Moisture_10 (%), size in bytes:1
+    0x3F: ('_ignore_sensor', 2),  # Soil Temperature_11 (C), size in bytes:2
+    0x40: ('_ignore_sensor', 1),  # Soil Moisture_11 (%), size in bytes:1
+    0x41: ('_ignore_sensor', 2),  # Soil Temperature_12 (C), size in bytes:2
+    0x42: ('_ignore_sensor', 1),  # Soil Moisture_12 (%), size in bytes:1
+    0x43: ('_ignore_sensor', 2),  # Soil Temperature_13 (C), size in bytes:2
+    0x44: ('_ignore_sensor', 1),  # Soil Moisture_13 (%), size in bytes:1
+    0x45: ('_ignore_sensor', 2),  # Soil Temperature_14 (C), size in bytes:2
+    0x46: ('_ignore_sensor', 1),  # Soil Moisture_14 (%), size in bytes:1
+    0x47: ('_ignore_sensor', 2),  # Soil Temperature_15 (C), size in bytes:2
+    0x48: ('_ignore_sensor', 1),  # Soil Moisture_15 (%), size in bytes:1
+    0x49: ('_ignore_sensor', 2),  # Soil Temperature_16 (C), size in bytes:2
+    0x4A: ('_ignore_sensor', 1),  # Soil Moisture_16 (%), size in bytes:1
+    0x4C: ('_ignore_sensor', 16),  # All_sensor lowbatt, size in bytes:16
+    0x4D: ('_ignore_sensor', 2),  # 24h_avg pm25_ch1 (ug/m3), size in bytes:2
+    0x4E: ('_ignore_sensor', 2),  # 24h_avg pm25_ch2 (ug/m3), size in bytes:2
+    0x4F: ('_ignore_sensor', 2),  # 24h_avg pm25_ch3 (ug/m3), size in bytes:2
+    0x50: ('_ignore_sensor', 2),  # 24h_avg pm25_ch4 (ug/m3), size in bytes:2
+    0x51: ('_ignore_sensor', 2),  # PM2.5 2 (ug/m3), size in bytes:2
+    0x52: ('_ignore_sensor', 2),  # PM2.5 3 (ug/m3), size in bytes:2
+    0x53: ('_ignore_sensor', 2),  # PM2.5 4 (ug/m3), size in bytes:2
+    0x58: ('_ignore_sensor', 1),  # Leak ch1 , size in bytes:1
+    0x59: ('_ignore_sensor', 1),  # Leak ch2 , size in bytes:1
+    0x5A: ('_ignore_sensor', 1),  # Leak ch3 , size in bytes:1
+    0x5B: ('_ignore_sensor', 1),  # Leak ch4 , size in bytes:1
+    0x60: ('_ignore_sensor', 1),  # Lightning distance 1-40KM, size in bytes:1
+    0x61: ('_ignore_sensor', 4),  # Lightning detected_time (UTC), size in bytes:4
+    0x62: ('_ignore_sensor', 4),  # Lightning power_time (UTC), size in bytes: 4
+    0x63: ('_ignore_sensor', 3),  # Battery Temperature 1 (C), size in bytes: 3
+    0x64: ('_ignore_sensor', 3),  # Battery Temperature 2 (C), size in bytes: 3
+    0x65: ('_ignore_sensor', 3),  # Battery Temperature 3 (C), size in bytes: 3
+    0x66: ('_ignore_sensor', 3),  # Battery Temperature 4 (C), size in bytes: 3
+    0x67: ('_ignore_sensor', 3),  # Battery Temperature 5 (C), size in bytes: 3
+    0x68: ('_ignore_sensor', 3),  # Battery Temperature 6 (C), size in bytes: 3
+    0x69: ('_ignore_sensor', 3),  # Battery Temperature 7 (C), size in bytes: 3
+    0x6A: ('_ignore_sensor', 3)  # Battery Temperature 8 (C), size in bytes: 3
+}
+_SENSOR_TABLE = [_SENSORS.get(sensor_id, ('_unknown_sensor', 1)) for sensor_id in range(256)]
+
 
 class GW1000(RMParser):
     parserName = 'GW1000 Parser'
@@ -61,27 +229,39 @@ class GW1000(RMParser):
     parserEnabled = False
     parserDebug = False
     parserInterval = 60  # seconds
+    reportInterval = 60  # observations, the current day observations are reported every hour
     # Device network settings
     ip = 'auto discover'
     port = 45000
-    # A collection of observations for the current day
-    observations = {RMParser.dataType.TEMPERATURE: None,
-                    RMParser.dataType.MAXTEMP: None,
-                    RMParser.dataType.MINTEMP: None,
-                    RMParser.dataType.RH: None,
-                    RMParser.dataType.MAXRH: None,
-                    RMParser.dataType.MINRH: None,
-                    RMParser.dataType.WIND: None,
-                    RMParser.dataType.SOLARRADIATION: None,
-                    RMParser.dataType.RAIN: None,
-                    RMParser.dataType.PRESSURE: None}
+    # The observations collected for each day
+    observation_keys = (_TEMPERATURE, _MAXTEMP, _MINTEMP, _RH, _MAXRH, _MINRH, _WIND, _SOLARRADIATION, _RAIN, _PRESSURE)
+    # Observations kept as a running total for the current day and reported as an average
+    averages = (_TEMPERATURE, _RH, _WIND, _SOLARRADIATION, _PRESSURE)
     defaultParams = {}
     params = {}
     # Current execution start of day timestamp
     currentTimestamp = 0
     startOfDayTimestamp = 0
     observation_counter = 0
-        
+
+    def __init__(self):
+        RMParser.__init__(self)
+        # Connection to the GW1000 device, kept open between executions, and its validated address
+        self.connection = None
+        self.address = None
+        # Live data receive buffer, allocated once and reused by each execution
+        self.buffer = bytearray(4096)
+        self.buffer_view = memoryview(self.buffer)
+        # A collection of observations for the current day, owned by this parser instance
+        self.observations = dict.fromkeys(GW1000.observation_keys, None)
+        self.observations_changed = False
+        # Sensor readers and sizes indexed by sensor id, bound once to avoid a lookup on every sensor read.
+        # Ignored and unknown sensors have no reader unless debugging, they are skipped without a function call.
+        # The parser debug is checked only here, the sensor readers table is fixed when the parser is created.
+        self.sensor_readers = [None if sensor_reader in ('_ignore_sensor', '_unknown_sensor') and not self.parserDebug
+                               else getattr(self, sensor_reader) for sensor_reader, size in _SENSOR_TABLE]
+        self.sensor_sizes = [size for sensor_reader, size in _SENSOR_TABLE]
+
     # noinspection PyUnusedLocal
     def isEnabledForLocation(self, tz, lat, lon):
         return GW1000.parserEnabled
@@ -91,42 +271,65 @@ class GW1000(RMParser):
         if self._connect() or self._discover():
             # Successfully connected to the GW1000 device, let's retrieve live data
             live_data = self._get_live_data()
+            if live_data is None:
+                # Unable to retrieve live data, the error was already logged and there is nothing to parse
+                return
+            start_of_day = rmGetStartOfDay(self.currentTimestamp)
             if self.startOfDayTimestamp == 0:
                 # First usage, initialization of the start of the day variable
-                self.startOfDayTimestamp = rmGetStartOfDay(self.currentTimestamp)
+                self.startOfDayTimestamp = start_of_day
             # Check if the live data is for a new day
-            elif rmGetStartOfDay(self.currentTimestamp) != self.startOfDayTimestamp:
+            elif start_of_day != self.startOfDayTimestamp:
                 # Report historical data of yesterday
                 self._report_observations()
                 # Reset the observations data for a new day
-                self._reset_observations()
+                self._reset_observations(start_of_day)
             # Parser live data and add observations
-            self._parse_live_data(live_data)
-            # A new observation, increment the observation counter
-            self.observation_counter += 1
-            self._report_observations()
+            if self._parse_live_data(live_data):
+                # A new observation, increment the observation counter
+                self.observation_counter += 1
+                # Report the current day observations on the first observation and then on each report interval,
+                # and only when the live data changed them, avoid writing the same values again
+                if self.observations_changed and (self.observation_counter - 1) % GW1000.reportInterval == 0:
+                    self._report_observations()
 
-    # Connect to the GW1000 device on the local network
+    # Connect to the GW1000 device on the local network, the connection is kept open between executions
     def _connect(self):
-        try:
-            # Check if the current ip is valid
-            socket.inet_aton(self.ip)
-        except socket.error:
-            # The current ip is invalid, we need to try to discover the device.
-            return False
+        if self.connection is not None:
+            return True
+        if self.address is None:
+            try:
+                # Check if the current ip is valid
+                socket.inet_aton(self.ip)
+            except socket.error:
+                # The current ip is invalid, we need to try to discover the device.
+                return False
+            self.address = (self.ip, self.port)
         try:
             # Create a client to connect to the local network device
             self.connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Send the small command packets right away, without waiting for the previous packet ACK (Nagle)
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             self.connection.settimeout(10)
-            self.connection.connect((self.ip, self.port))
+            self.connection.connect(self.address)
+            # The device replies within milliseconds, a shorter timeout detects a dropped connection sooner
+            self.connection.settimeout(5)
             return True
         except socket.error:
             self._log_error('Error: unable to connect to the GW1000 local network device')
-            self.connection.close()
+            self._disconnect()
             return False
 
+    # Close the connection to the GW1000 device, a new one is created on the next connect
+    def _disconnect(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
     # Discover the GW1000 device on the local network.
     def _discover(self):
+        sock = None
         try:
             # Create a socket to send and receive the CMD_BROADCAST command.
             sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -135,248 +338,221 @@ class GW1000(RMParser):
             sock.bind(('', 59387))
         except socket.error:
             self._log_error('Error: unable to listening for discover packet')
+            if sock is not None:
+                sock.close()
             return False
-        # Packet Format: HEADER, CMD_BROADCAST, SIZE, CHECKSUM
-        packet = '\xff\xff\x12\x03\x15'
-        # Try to find the device within 5 retries
-        for n in range(5):
-            try:
-                # Sent a CMD_BROADCAST command
-                sock.sendto(packet, ('255.255.255.255', 46000))
-                packet = sock.recv(1024)
-                # Check device name to avoid detection of other local Ecowiit/Ambient consoles
-                device_name = packet[18:len(packet) - 1]
-                if device_name.startswith('GW'):
-                    self.ip = '%d.%d.%d.%d' % struct.unpack('>BBBB', packet[11:15])
-                    self.port = struct.unpack('>H', packet[15: 17])[0]
-                    return self._connect()
-                else:
-                    self.lastKnownError = 'Error: Unsupported local console: {}'.format(device_name)
-            except socket.error:
-                self.lastKnownError = 'Error: unable to find GW1000 device on local network'
+        try:
+            # Enlarge the socket buffers, to avoid dropping the discover reply on busy local networks
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        except socket.error:
+            # The system might limit the buffer sizes, keep the default ones
+            pass
+        try:
+            # Try to find the device within 5 retries
+            for n in range(5):
+                try:
+                    # Sent a CMD_BROADCAST command
+                    sock.sendto(_CMD_BROADCAST, ('255.255.255.255', 46000))
+                    # Wait for the reply, starting with 0.25 seconds and doubling on each retry up to 2 seconds
+                    readable, writable, exceptional = select.select([sock], [], [], min(0.25 * 2 ** n, 2.0))
+                    if not readable:
+                        self.lastKnownError = 'Error: unable to find GW1000 device on local network'
+                        continue
+                    reply = sock.recv(1024)
+                    # Check device name to avoid detection of other local Ecowiit/Ambient consoles
+                    device_name = reply[18:len(reply) - 1]
+                    if device_name.startswith(b'GW'):
+                        ip, self.port = _DEVICE_ADDRESS.unpack_from(reply, 11)
+                        self.ip = socket.inet_ntoa(ip)
+                        self.address = (self.ip, self.port)
+                        return self._connect()
+                    else:
+                        self.lastKnownError = 'Error: Unsupported local console: {}'.format(device_name)
+                except socket.error:
+                    self.lastKnownError = 'Error: unable to find GW1000 device on local network'
+        finally:
+            # Release the discover port, the discovery only runs when unable to connect to the known device
+            sock.close()
         self._log_error(self.lastKnownError)
         return False
 
     # Get current live conditions from the GW1000 device
     def _get_live_data(self):
-        try:
-            # Packet Format: HEADER, CMD_GW1000_LIVE_DATA, SIZE, CHECKSUM
-            packet = '\xFF\xFF\x27\x03\x2A'
-            # Send the command CMD_GW1000_LIVE_DATA to the local network device
-            self.connection.sendall(packet)
-            live_data = self.connection.recv(1024)
-            self.currentTimestamp = current_timestamp()
-            return live_data
-        except socket.error:
-            self._log_error('Error: unable to retrieve live data from the local network device')
-        finally:
-            self.connection.close()
+        # Try twice, the device might have dropped the connection kept open since the last execution
+        for n in range(2):
+            try:
+                # Send the command CMD_GW1000_LIVE_DATA to the local network device
+                self.connection.sendall(_CMD_GW1000_LIVE_DATA)
+                # Response Format: HEADER, CMD_GW1000_LIVE_DATA, SIZE (2 bytes, from CMD to CHECKSUM), DATA, CHECKSUM
+                # The response can arrive in fragments, keep reading until the whole packet is received
+                # The response is received into the same buffer on each execution, without allocating a new one
+                received = self._receive(0)
+                while received < 5:
+                    received += self._receive(received)
+                size = packet_size(self.buffer)
+                if size > len(self.buffer):
+                    self._log_error('Error: live data packet too large, {} bytes, the maximum is {} bytes'.format(
+                        size, len(self.buffer)), self.buffer[:5])
+                    # The rest of the packet is left unread on the connection, reconnect on the next execution
+                    self._disconnect()
+                    return None
+                while received < size:
+                    received += self._receive(received)
+                self.currentTimestamp = current_timestamp()
+                # The buffer holds the live data packet, its size is given by the packet SIZE header
+                return self.buffer
+            except socket.error:
+                self._disconnect()
+                # Reconnect only for the second try, otherwise the next execution will connect again
+                # A failed reconnect logs its own error, the retrieve error is logged after it
+                if n > 0 or not self._connect():
+                    break
+        self._log_error('Error: unable to retrieve live data from the local network device')
 
-    # Parse Live Data packet by iterate over sensors
+    # Receive a fragment of the live data into the buffer, after the bytes already received
+    def _receive(self, received):
+        fragment_size = self.connection.recv_into(self.buffer_view[received:])
+        if not fragment_size:
+            raise socket.error('connection closed by the local network device')
+        return fragment_size
+
+    # Parse Live Data packet by iterate over sensors, return False if the packet is corrupted
     def _parse_live_data(self, packet):
-        data = packet[5: len(packet) - 1]
-        index = 0
-        size = len(data)
-        while index < size:
-            index = self._read_sensor(data, index)
+        if packet[:3] != _LIVE_DATA_HEADER:
+            self._log_error('Error: invalid header on live data packet', packet[:5])
+            # The connection stream is out of sync, reconnect on the next execution to start on a clean stream
+            self._disconnect()
+            return False
+        size = packet_size(packet)
+        if checksum(packet, size) != packet[size - 1]:
+            self._log_error('Error: invalid checksum on live data packet', packet[:size])
+            # A corrupted SIZE might have left unread bytes on the connection, reconnect on the next execution
+            self._disconnect()
+            return False
+        # The sensors are read in place from the packet, between the SIZE header and the CHECKSUM
+        index = 5
+        while index < size - 1:
+            index = self._read_sensor(packet, index)
+        return True
 
     def _read_sensor(self, data, index):
-        switcher = {
-            b'\x01': (self._ignore_sensor, 2),  # Indoor Temperature (C), size in bytes:2
-            b'\x02': (self._outdoor_temperature, 2),  # Outdoor Temperature (C), size in bytes:2
-            b'\x03': (self._ignore_sensor, 2),  # Dew point (C), size in bytes:2
-            b'\x04': (self._ignore_sensor, 2),  # Wind chill (C), size in bytes:2
-            b'\x05': (self._ignore_sensor, 2),  # Heat index (C), size in bytes:2
-            b'\x06': (self._ignore_sensor, 1),  # Indoor Humidity (%), size in bytes:1
-            b'\x07': (self._outdoor_humidity, 1),  # Outdoor Humidity (%), size in bytes:1
-            b'\x08': (self._ignore_sensor, 2),  # Absolutely Barometric (hpa), size in bytes:2
-            b'\x09': (self._relative_barometric, 2),  # Relative Barometric (hpa), size in bytes:2
-            b'\x0A': (self._ignore_sensor, 2),  # Wind Direction (360), size in bytes:2
-            b'\x0B': (self._wind_speed, 2),  # Wind Speed (m/s), size in bytes:2
-            b'\x0C': (self._ignore_sensor, 2),  # Gust Speed (m/s), size in bytes:2
-            b'\x0D': (self._ignore_sensor, 2),  # Rain Event (mm), size in bytes:2
-            b'\x0E': (self._ignore_sensor, 2),  # Rain Rate (mm/h), size in bytes:2
-            b'\x0F': (self._ignore_sensor, 2),  # Rain hour (mm), size in bytes:2
-            b'\x10': (self._rain_day, 2),  # Rain Day (mm), size in bytes:2
-            b'\x11': (self._ignore_sensor, 2),  # Rain Week (mm), size in bytes:2
-            b'\x12': (self._ignore_sensor, 4),  # Rain Month (mm), size in bytes:4
-            b'\x13': (self._ignore_sensor, 4),  # Rain Year (mm), size in bytes:4
-            b'\x14': (self._ignore_sensor, 4),  # Rain Totals (mm), size in bytes:4
-            b'\x15': (self._light, 4),  # Light  (lux), size in bytes:4
-            b'\x16': (self._ignore_sensor, 2),  # UV  (uW/m2), size in bytes:2
-            b'\x17': (self._ignore_sensor, 1),  # UVI (0-15 index), size in bytes:1
-            b'\x18': (self._ignore_sensor, 6),  # Date and time, size in bytes:6
-            b'\x19': (self._ignore_sensor, 2),  # Day max_wind (m/s), size in bytes:2
-            b'\x1A': (self._ignore_sensor, 2),  # Temperature 1 (C), size in bytes:2
-            b'\x1B': (self._ignore_sensor, 2),  # Temperature 2 (C), size in bytes:2
-            b'\x1C': (self._ignore_sensor, 2),  # Temperature 3 (C), size in bytes:2
-            b'\x1D': (self._ignore_sensor, 2),  # Temperature 4 (C), size in bytes:2
-            b'\x1E': (self._ignore_sensor, 2),  # Temperature 5 (C), size in bytes:2
-            b'\x1F': (self._ignore_sensor, 2),  # Temperature 6 (C), size in bytes:2
-            b'\x20': (self._ignore_sensor, 2),  # Temperature 7 (C), size in bytes:2
-            b'\x21': (self._ignore_sensor, 2),  # Temperature 8 (C), size in bytes:2
-            b'\x22': (self._ignore_sensor, 1),  # Humidity 1 0-100%, size in bytes:1
-            b'\x23': (self._ignore_sensor, 1),  # Humidity 2 0-100%, size in bytes:1
-            b'\x24': (self._ignore_sensor, 1),  # Humidity 3 0-100%, size in bytes:1
-            b'\x25': (self._ignore_sensor, 1),  # Humidity 4 0-100%, size in bytes:1
-            b'\x26': (self._ignore_sensor, 1),  # Humidity 5 0-100%, size in bytes:1
-            b'\x27': (self._ignore_sensor, 1),  # Humidity 6 0-100%, size in bytes:1
-            b'\x28': (self._ignore_sensor, 1),  # Humidity 7 0-100%, size in bytes:1
-            b'\x29': (self._ignore_sensor, 1),  # Humidity 8 0-100%, size in bytes:1
-            b'\x2A': (self._ignore_sensor, 2),  # PM2.5 1 (ug/m3), size in bytes:2
-            b'\x2B': (self._ignore_sensor, 2),  # Soil Temperature_1 (C), size in bytes:2
-            b'\x2C': (self._ignore_sensor, 1),  # Soil Moisture_1 (%), size in bytes:1
-            b'\x2D': (self._ignore_sensor, 2),  # Soil Temperature_2 (C), size in bytes:2
-            b'\x2E': (self._ignore_sensor, 1),  # Soil Moisture_2 (%), size in bytes:1
-            b'\x2F': (self._ignore_sensor, 2),  # Soil Temperature_3 (C), size in bytes:2
-            b'\x30': (self._ignore_sensor, 1),  # Soil Moisture_3 (%), size in bytes:1
-            b'\x31': (self._ignore_sensor, 2),  # Soil Temperature_4 (C), size in bytes:2
-            b'\x32': (self._ignore_sensor, 1),  # Soil Moisture_4 (%), size in bytes:1
-            b'\x33': (self._ignore_sensor, 2),  # Soil Temperature_5 (C), size in bytes:2
-            b'\x34': (self._ignore_sensor, 1),  # Soil Moisture_5 (%), size in bytes:1
-            b'\x35': (self._ignore_sensor, 2),  # Soil Temperature_6 (C), size in bytes:2
-            b'\x36': (self._ignore_sensor, 1),  # Soil Moisture_6 (%), size in bytes:1
-            b'\x37': (self._ignore_sensor, 2),  # Soil Temperature_7 (C), size in bytes:2
-            b'\x38': (self._ignore_sensor, 1),  # Soil Moisture_7 (%), size in bytes:1
-            b'\x39': (self._ignore_sensor, 2),  # Soil Temperature_8 (C), size in bytes:2
-            b'\x3A': (self._ignore_sensor, 1),  # Soil Moisture_8 (%), size in bytes:1
-            b'\x3B': (self._ignore_sensor, 2),  # Soil Temperature_9 (C), size in bytes:2
-            b'\x3C': (self._ignore_sensor, 1),  # Soil Moisture_9 (%), size in bytes:1
-            b'\x3D': (self._ignore_sensor, 2),  # Soil Temperature_10 (C), size in bytes:2
-            b'\x3E': (self._ignore_sensor, 1),  # Soil Moisture_10 (%), size in bytes:1
-            b'\x3F': (self._ignore_sensor, 2),  # Soil Temperature_11 (C), size in bytes:2
-            b'\x40': (self._ignore_sensor, 1),  # Soil Moisture_11 (%), size in bytes:1
-            b'\x41': (self._ignore_sensor, 2),  # Soil Temperature_12 (C), size in bytes:2
-            b'\x42': (self._ignore_sensor, 1),  # Soil Moisture_12 (%), size in bytes:1
-            b'\x43': (self._ignore_sensor, 2),  # Soil Temperature_13 (C), size in bytes:2
-            b'\x44': (self._ignore_sensor, 1),  # Soil Moisture_13 (%), size in bytes:1
-            b'\x45': (self._ignore_sensor, 2),  # Soil Temperature_14 (C), size in bytes:2
-            b'\x46': (self._ignore_sensor, 1),  # Soil Moisture_14 (%), size in bytes:1
-            b'\x47': (self._ignore_sensor, 2),  # Soil Temperature_15 (C), size in bytes:2
-            b'\x48': (self._ignore_sensor, 1),  # Soil Moisture_15 (%), size in bytes:1
-            b'\x49': (self._ignore_sensor, 2),  # Soil Temperature_16 (C), size in bytes:2
-            b'\x4A': (self._ignore_sensor, 1),  # Soil Moisture_16 (%), size in bytes:1
-            b'\x4C': (self._ignore_sensor, 16),  # All_sensor lowbatt, size in bytes:16
-            b'\x4D': (self._ignore_sensor, 2),  # 24h_avg pm25_ch1 (ug/m3), size in bytes:2
-            b'\x4E': (self._ignore_sensor, 2),  # 24h_avg pm25_ch2 (ug/m3), size in bytes:2
-            b'\x4F': (self._ignore_sensor, 2),  # 24h_avg pm25_ch3 (ug/m3), size in bytes:2
-            b'\x50': (self._ignore_sensor, 2),  # 24h_avg pm25_ch4 (ug/m3), size in bytes:2
-            b'\x51': (self._ignore_sensor, 2),  # PM2.5 2 (ug/m3), size in bytes:2
-            b'\x52': (self._ignore_sensor, 2),  # PM2.5 3 (ug/m3), size in bytes:2
-            b'\x53': (self._ignore_sensor, 2),  # PM2.5 4 (ug/m3), size in bytes:2
-            b'\x58': (self._ignore_sensor, 1),  # Leak ch1 , size in bytes:1
-            b'\x59': (self._ignore_sensor, 1),  # Leak ch2 , size in bytes:1
-            b'\x5A': (self._ignore_sensor, 1),  # Leak ch3 , size in bytes:1
-            b'\x5B': (self._ignore_sensor, 1),  # Leak ch4 , size in bytes:1
-            b'\x60': (self._ignore_sensor, 1),  # Lightning distance 1-40KM, size in bytes:1
-            b'\x61': (self._ignore_sensor, 4),  # Lightning detected_time (UTC), size in bytes:4
-            b'\x62': (self._ignore_sensor, 4),  # Lightning power_time (UTC), size in bytes: 4
-            b'\x63': (self._ignore_sensor, 3),  # Battery Temperature 1 (C), size in bytes: 3
-            b'\x64': (self._ignore_sensor, 3),  # Battery Temperature 2 (C), size in bytes: 3
-            b'\x65': (self._ignore_sensor, 3),  # Battery Temperature 3 (C), size in bytes: 3
-            b'\x66': (self._ignore_sensor, 3),  # Battery Temperature 4 (C), size in bytes: 3
-            b'\x67': (self._ignore_sensor, 3),  # Battery Temperature 5 (C), size in bytes: 3
-            b'\x68': (self._ignore_sensor, 3),  # Battery Temperature 6 (C), size in bytes: 3
-            b'\x69': (self._ignore_sensor, 3),  # Battery Temperature 7 (C), size in bytes: 3
-            b'\x6A': (self._ignore_sensor, 3)  # Battery Temperature 8 (C), size in bytes: 3
-        }
         sensor_id = data[index]
-        sensor_reader, size = switcher.get(sensor_id, (self._unknown_sensor, 1))
-        sensor_reader(data, index, size)
+        size = self.sensor_sizes[sensor_id]
+        sensor_reader = self.sensor_readers[sensor_id]
+        if sensor_reader is not None:
+            sensor_reader(data, index, size)
         return index + 1 + size
 
     def _outdoor_temperature(self, data, index, size):
-        outdoor_temperature = read_int(data[index + 1: index + 1 + size], False, size) / 10.0  # Sensor Unit: degC
-        self._observation_average(RMParser.dataType.TEMPERATURE, outdoor_temperature)  # RainMachine Unit: degC
-        # Check if the outdoor_temperature is a new maximum or minimum
-        self._observation_max_min(RMParser.dataType.MAXTEMP, RMParser.dataType.MINTEMP, outdoor_temperature)
+        outdoor_temperature = read_int(data, False, size, index + 1) / 10.0  # Sensor Unit: degC
+        # Add the outdoor_temperature to the average, and check if it is a new maximum or minimum
+        self._observation_total_max_min(_TEMPERATURE, _MAXTEMP, _MINTEMP, outdoor_temperature)  # RainMachine Unit: degC
 
     def _outdoor_humidity(self, data, index, size):
-        outdoor_humidity = read_int(data[index + 1: index + 1 + size], False, size)  # Sensor Unit: %
-        self._observation_average(RMParser.dataType.RH, outdoor_humidity)  # RainMachine Unit: %
-        # Check if the outdoor_humidity is a new maximum or minimum
-        self._observation_max_min(RMParser.dataType.MAXRH, RMParser.dataType.MINRH, outdoor_humidity)
+        outdoor_humidity = read_int(data, False, size, index + 1)  # Sensor Unit: %
+        # Add the outdoor_humidity to the average, and check if it is a new maximum or minimum
+        self._observation_total_max_min(_RH, _MAXRH, _MINRH, outdoor_humidity)  # RainMachine Unit: %
 
     def _relative_barometric(self, data, index, size):
-        relative_barometric = read_int(data[index + 1: index + 1 + size], False, size)  # Sensor Unit: dPa
+        relative_barometric = read_int(data, False, size, index + 1)  # Sensor Unit: dPa
         relative_barometric /= 100.0  # Conversion from dPa to kPa
-        self._observation_average(RMParser.dataType.PRESSURE, relative_barometric)  # RainMachine Unit: kPa
+        self._observation_total(_PRESSURE, relative_barometric)  # RainMachine Unit: kPa
 
     def _wind_speed(self, data, index, size):
-        wind_speed = read_int(data[index + 1: index + 1 + size], False, size) / 10.0  # Sensor Unit: m/s
-        self._observation_average(RMParser.dataType.WIND, wind_speed)  # RainMachine Unit: m/s
+        wind_speed = read_int(data, False, size, index + 1) / 10.0  # Sensor Unit: m/s
+        self._observation_total(_WIND, wind_speed)  # RainMachine Unit: m/s
 
     def _rain_day(self, data, index, size):
-        rain_day = read_int(data[index + 1: index + 1 + size], False, size) / 10.0  # Sensor Unit: mm
+        rain_day = read_int(data, False, size, index + 1) / 10.0  # Sensor Unit: mm
+        rain = self.observations[_RAIN]
         # Preventive check, the rain amount should be cumulative and always bigger that the previous value.
-        if self.observations[RMParser.dataType.RAIN] is None or rain_day > self.observations[RMParser.dataType.RAIN]:
-            self.observations[RMParser.dataType.RAIN] = rain_day  # RainMachine Unit: mm
+        if rain is None or rain_day > rain:
+            self.observations[_RAIN] = rain_day  # RainMachine Unit: mm
+            self.observations_changed = True
 
     def _light(self, data, index, size):
-        light = read_int(data[index + 1: index + 1 + size], False, size) / 10.0  # Sensor Unit: lux
-        solar_radiation = float(light) * 0.0079  # Convert lux into w/m2, 0.0079 is the ratio at sunlight spectrum
-        solar_radiation *= 0.0036  # Convert w/m2 to MJ/m2/h, 1 W/m2 = 1 J/m2/Sec
-        self._observation_average(RMParser.dataType.SOLARRADIATION, solar_radiation)  # RainMachine Unit: MJ/m2/day
+        # Sensor Unit: 0.1 lux, converted into MJ/m2/h with a single pre-computed ratio
+        solar_radiation = read_int(data, False, size, index + 1) * _LIGHT_TO_SOLAR_RADIATION
+        self._observation_total(_SOLARRADIATION, solar_radiation)  # RainMachine Unit: MJ/m2/day
 
     # noinspection PyMethodMayBeStatic,PyUnusedLocal
     def _ignore_sensor(self, data, index, size):
-        log.debug('Ignoring Sensor Id: %02x' % ord(data[index]))
+        log.debug('Ignoring Sensor Id: %02x' % data[index])
 
     # noinspection PyMethodMayBeStatic,PyUnusedLocal
     def _unknown_sensor(self, data, index, size):
-        log.debug('Unknown Sensor Id found: %02x' % ord(data[index]))
+        log.debug('Unknown Sensor Id found: %02x' % data[index])
 
     # Helper function to reset the observation data for a new day
-    def _reset_observations(self):
-        self.observations = dict.fromkeys(self.observations, None)
+    def _reset_observations(self, start_of_day):
+        self.observations = dict.fromkeys(GW1000.observation_keys, None)
         self.observation_counter = 0
-        self.startOfDayTimestamp = rmGetStartOfDay(self.currentTimestamp)
+        self.startOfDayTimestamp = start_of_day
 
-    # Helper function to add observations
+    # Helper function to add observations, the averages are the running total divided by the number of observations
     def _report_observations(self):
+        if self.observation_counter == 0:
+            # No observations to report, for instance when every live data packet of the day was corrupted
+            return
+        averages = GW1000.averages
+        inverse_counter = 1.0 / self.observation_counter
+        start_of_day = self.startOfDayTimestamp
         for key, value in self.observations.items():
             if value is not None:
-                self.addValue(key, self.startOfDayTimestamp, value)
+                if key in averages:
+                    value *= inverse_counter
+                self.addValue(key, start_of_day, value)
+        self.observations_changed = False
         log.debug(self.observations)
 
-    # Helper function to calculate an observation average
-    def _observation_average(self, key, new_value):
-        total_value = 0.0 if self.observations[key] is None else float(self.observations[key]) * self.observation_counter
-        average = (total_value + float(new_value)) / (self.observation_counter + 1)
-        self.observations[key] = average
-
-    # Helper function to check the new maximum and minimum of a observation
-    def _observation_max_min(self, max_key, min_key, value):
-        # Check if the value is a new maximum
-        if self.observations[max_key] is None or value > self.observations[max_key]:
-            self.observations[max_key] = value
-        # Check if the value is a new minimum
-        if self.observations[min_key] is None or value < self.observations[min_key]:
-            self.observations[min_key] = value
+    # Helper function to accumulate an observation running total, the average is computed only when reported
+    def _observation_total(self, key, new_value):
+        total = self.observations[key]
+        self.observations[key] = float(new_value) if total is None else total + new_value
+        self.observations_changed = True
+
+    # Helper function to accumulate an observation running total and check its new maximum and minimum, in one pass
+    def _observation_total_max_min(self, key, max_key, min_key, value):
+        observations = self.observations
+        total = observations[key]
+        if total is None:
+            # First observation of the day, it is also the maximum and the minimum
+            observations[key] = float(value)
+            observations[max_key] = value
+            observations[min_key] = value
+        else:
+            observations[key] = total + value
+            # Check if the value is a new maximum or a new minimum, each one is read only once
+            if value > observations[max_key]:
+                observations[max_key] = value
+            elif value < observations[min_key]:
+                observations[min_key] = value
+        self.observations_changed = True
 
     # Helper function to log errors
     def _log_error(self, message, packet=None):
         if packet is not None:
-            self.lastKnownError = message + ' ' + ''.join('\\x%02X' % ord(b) for b in packet)
+            self.lastKnownError = message + ' ' + binascii.hexlify(packet).decode('ascii')
         else:
             self.lastKnownError = message
         log.error(self.lastKnownError)
 
 
 # Helper function to return an Integer from a network packet as BigEndian with different sizes, signed or unsigned.
-def read_int(data, unsigned, size):
-    if size == 1 and unsigned:
-        return struct.unpack('>B', data[0:size])[0]
-    elif size == 1 and not unsigned:
-        return struct.unpack('>b', data[0:size])[0]
-    elif size == 2 and unsigned:
-        return struct.unpack('>H', data[0:size])[0]
-    elif size == 2 and not unsigned:
-        return struct.unpack('>h', data[0:size])[0]
-    elif size == 4 and unsigned:
-        return struct.unpack('>I', data[0:size])[0]
-    elif size == 4 and not unsigned:
-        return struct.unpack('>i', data[0:size])[0]
+# The integer is read in place at the given offset, without slicing the packet.
+def read_int(data, unsigned, size, offset=0):
+    return _INT_READERS[(size, unsigned)].unpack_from(data, offset)[0]
+
+
+# Helper function to return the size of a network packet, the packet SIZE (from CMD to CHECKSUM) plus the HEADER.
+def packet_size(packet):
+    return read_int(packet, True, 2, 3) + 2
+
+
+# Helper function to return the checksum of a network packet, the sum of the bytes from CMD to DATA.
+def checksum(packet, size):
+    return sum(packet[2: size - 1]) & 0xFF
 
 
 # Helper function to get the current timestamp with microseconds